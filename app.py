@@ -1,4 +1,8 @@
-from books_app import app
+from books_app import create_app, db
+
+app = create_app()
 
 if __name__ == "__main__":
+    with app.app_context():
+        db.create_all()
     app.run(debug=True)
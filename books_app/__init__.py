@@ -5,11 +5,7 @@ from flask_bcrypt import Bcrypt
 from books_app.config import Config
 import os
 
-app = Flask(__name__)
-app.config.from_object(Config)
-app.secret_key = os.urandom(24)
-
-db = SQLAlchemy(app)
+db = SQLAlchemy()
 
 ###########################
 # Authentication
@@ -19,7 +15,6 @@ db = SQLAlchemy(app)
 
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
-login_manager.init_app(app)
 
 from .models import User
 
@@ -27,17 +22,37 @@ from .models import User
 def load_user(user_id):
     return User.query.get(user_id)
 
-bcrypt = Bcrypt(app)
+bcrypt = Bcrypt()
 
 ###########################
-# Blueprints
+# App Factory
 ###########################
 
-from books_app.main.routes import main as main_routes
-app.register_blueprint(main_routes)
-
-from books_app.auth.routes import auth as auth_routes
-app.register_blueprint(auth_routes)
-
-with app.app_context():
-    db.create_all()
+def create_app(config=Config):
+    """Create the app and bind the extensions to it."""
+    app = Flask(__name__)
+    app.config.from_object(config)
+    # A fixed key in tests keeps session cookies valid from test to test.
+    if app.config.get('TESTING'):
+        app.secret_key = b'testing-fixed-key'
+    else:
+        app.secret_key = os.urandom(24)
+
+    db.init_app(app)
+    login_manager.init_app(app)
+    # Flask-Bcrypt keeps BCRYPT_LOG_ROUNDS on the shared extension, so the
+    # last app created sets it for all of them; hash_password() passes each
+    # app's own cost instead.
+    bcrypt.init_app(app)
+
+    ###########################
+    # Blueprints
+    ###########################
+
+    from books_app.main.routes import main as main_routes
+    app.register_blueprint(main_routes)
+
+    from books_app.auth.routes import auth as auth_routes
+    app.register_blueprint(auth_routes)
+
+    return app
@@ -2,7 +2,7 @@ from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
 from wtforms.validators import DataRequired, Length, ValidationError
 from books_app.models import User
-from books_app import bcrypt
+from books_app.auth.hashing import check_password
 
 class SignUpForm(FlaskForm):
     username = StringField('User Name',
@@ -29,6 +29,5 @@ class LoginForm(FlaskForm):
 
     def validate_password(self, password):
         user = User.query.filter_by(username=self.username.data).first()
-        if user and not bcrypt.check_password_hash(
-                user.password, password.data):
+        if user and not check_password(user.password, password.data):
             raise ValidationError('Password doesn\'t match. Please try again.')
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""Hash and check passwords, optionally on a thread pool."""
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+import os
+
+from books_app import bcrypt
+
+# Threads are only started once ASYNC_BCRYPT sends work here.
+executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+def _run(func, *args):
+    if current_app.config.get('ASYNC_BCRYPT'):
+        return executor.submit(func, *args).result()
+    return func(*args)
+
+def hash_password(password):
+    """Return the bcrypt hash of a password, as a string."""
+    # Use this app's cost; the shared Bcrypt extension only remembers the
+    # cost of the app that was created last.
+    rounds = current_app.config.get('BCRYPT_LOG_ROUNDS')
+    password_hash = _run(bcrypt.generate_password_hash, password, rounds)
+    return password_hash.decode('utf-8')
+
+def check_password(password_hash, password):
+    """Return True if the password matches the bcrypt hash."""
+    return _run(bcrypt.check_password_hash, password_hash, password)
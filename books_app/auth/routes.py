@@ -3,10 +3,10 @@ from flask_login import login_user, logout_user, login_required, current_user
 
 from books_app.models import Book, Author, Genre, User
 from books_app.auth.forms import SignUpForm, LoginForm
-from books_app import bcrypt
+from books_app.auth.hashing import hash_password
 
-# Import app and db from events_app package so that we can run app
-from books_app import app, db
+# Import db from books_app package so that we can run app
+from books_app import db
 
 auth = Blueprint("auth", __name__)
 
@@ -14,7 +14,7 @@ auth = Blueprint("auth", __name__)
 def signup():
     form = SignUpForm()
     if form.validate_on_submit():
-        hashed_password = bcrypt.generate_password_hash(form.password.data).decode('utf-8')
+        hashed_password = hash_password(form.password.data)
         user = User(
             username=form.username.data,
             password=hashed_password
@@ -1,10 +1,14 @@
 import os
-from unittest import TestCase
+import hashlib
+from unittest.mock import patch
 
-from datetime import date
-
-from books_app import app, db, bcrypt
-from books_app.models import Book, Author, User, Audience
+from books_app import create_app, bcrypt
+from books_app.auth import hashing
+from books_app.auth.hashing import hash_password
+from books_app.config import Config, TestConfig
+from books_app.testing.base import BaseTestCase
+from books_app.testing.fixtures import create_user
+from books_app.models import User
 
 """
 Run these tests with the command:
@@ -16,69 +20,50 @@ python -m unittest books_app.main.tests
 #################################################
 
 
-def create_books():
-    a1 = Author(name='Harper Lee')
-    b1 = Book(
-        title='To Kill a Mockingbird',
-        publish_date=date(1960, 7, 11),
-        author=a1
-    )
-    db.session.add(b1)
-
-    a2 = Author(name='Sylvia Plath')
-    b2 = Book(title='The Bell Jar', author=a2)
-    db.session.add(b2)
-    db.session.commit()
+def fake_password_hash(password, rounds=None):
+    """Cheap stand-in for bcrypt, for tests that never check the hash."""
+    return hashlib.sha256(password.encode('utf-8')).hexdigest().encode('utf-8')
 
 
-def create_user():
-    password_hash = bcrypt.generate_password_hash('password').decode('utf-8')
-    user = User(username='me1', password=password_hash)
-    db.session.add(user)
-    db.session.commit()
-
 #################################################
 # Tests
 #################################################
 
 
-class AuthTests(TestCase):
+class AuthTests(BaseTestCase):
     """Tests for authentication (login & signup)."""
 
     def setUp(self):
         """Executed prior to each test."""
-        app.config['TESTING'] = True
-        app.config['WTF_CSRF_ENABLED'] = False
-        app.config['DEBUG'] = False
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-        self.app = app.test_client()
-        db.drop_all()
-        db.create_all()
+        super().setUp()
+        # Start every test logged out.
+        self.client.cookie_jar.clear()
 
+    @patch.object(bcrypt, 'generate_password_hash', fake_password_hash)
     def test_signup(self):
         post_data = {
             'username': 'testname',
             'password': '123'
         }
-        self.app.post('/signup', data=post_data)
+        self.client.post('/signup', data=post_data)
 
         user = User.query.filter_by(username='testname')
         self.assertIsNotNone(user)
 
+    @patch.object(bcrypt, 'generate_password_hash', fake_password_hash)
     def test_signup_existing_user(self):
         post_data = {
             'username': 'testtwoname',
             'password': 'password'
         }
-        self.app.post('/signup', data=post_data)
+        self.client.post('/signup', data=post_data)
 
         post_data = {
             'username': 'testtwoname',
             'password': 'password'
         }
-        response = self.app.post('/signup', data=post_data)
-        self.assertIn('that username is taken',
-                      response.get_data(as_text=True))
+        response = self.client.post('/signup', data=post_data)
+        self.assertIn(b'that username is taken', response.data)
 
     def test_login_correct_password(self):
         create_user()
@@ -87,19 +72,47 @@ class AuthTests(TestCase):
             'username': 'me1',
             'password': 'password'
         }
-        self.app.post('/login', data=post_data)
+        self.client.post('/login', data=post_data)
+
+        response = self.client.get('/', follow_redirects=True)
+        self.assertIn(b'You are logged in as me1', response.data)
+
+    def test_signup_and_login_async_bcrypt(self):
+        self.app.config['ASYNC_BCRYPT'] = True
+        self.addCleanup(self.app.config.pop, 'ASYNC_BCRYPT')
+
+        post_data = {
+            'username': 'testname',
+            'password': '123'
+        }
+        with patch.object(hashing.executor, 'submit',
+                          wraps=hashing.executor.submit) as submit:
+            self.client.post('/signup', data=post_data)
+            self.client.post('/login', data=post_data)
+
+        # One call hashed the new password, the other checked it at login
+        self.assertEqual(
+            [c.args[0] for c in submit.call_args_list],
+            [bcrypt.generate_password_hash, bcrypt.check_password_hash])
+
+        response = self.client.get('/', follow_redirects=True)
+        self.assertIn(b'You are logged in as testname', response.data)
+
+    def test_hash_password_uses_app_bcrypt_cost(self):
+        production_app = create_app(Config)
+        # Creating another test app puts the shared extension back at cost 4
+        create_app(TestConfig)
 
-        response = self.app.get('/', follow_redirects=True)
-        response_text = response.get_data(as_text=True)
-        self.assertIn('You are logged in as me1', response_text)
+        with production_app.app_context():
+            self.assertTrue(hash_password('password').startswith('$2b$12$'))
 
     def test_login_nonexistent_user(self):
         post_data = {
             'username': 'username312',
             'password': 'password312'
         }
-        response = self.app.post('/login', data=post_data)
-        self.assertIn('User does not exist', response.get_data(as_text=True))
+        response = self.client.post('/login', data=post_data)
+        self.assertIn(b'User does not exist', response.data)
 
     def test_login_incorrect_password(self):
         create_user()
@@ -108,8 +121,8 @@ class AuthTests(TestCase):
             'username': 'me1',
             'password': 'password1'
         }
-        response = self.app.post('/login', data=post_data)
-        self.assertIn("Password incorrect", response.get_data(as_text=True))
+        response = self.client.post('/login', data=post_data)
+        self.assertIn(b"Password incorrect", response.data)
 
     def test_logout(self):
         create_user()
@@ -118,8 +131,7 @@ class AuthTests(TestCase):
             'username': 'me1',
             'password': 'password'
         }
-        response = self.app.post('/login', data=post_data)
+        response = self.client.post('/login', data=post_data)
 
-        response = self.app.get('/logout', follow_redirects=True)
-        self.assertNotIn('You are logged in as me1',
-                         response.get_data(as_text=True))
+        response = self.client.get('/logout', follow_redirects=True)
+        self.assertNotIn(b'You are logged in as me1', response.data)
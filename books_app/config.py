@@ -1,5 +1,6 @@
 """Initialize Config class to access environment variables."""
 from dotenv import load_dotenv
+from sqlalchemy.pool import StaticPool
 import os
 
 load_dotenv()
@@ -10,3 +11,33 @@ class Config(object):
     SQLALCHEMY_DATABASE_URI = os.getenv('SQLALCHEMY_DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.getenv('SECRET_KEY')
+    # Set explicitly: hash_password() reads it from the app handling the
+    # request, not from the Bcrypt extension shared by every app.
+    BCRYPT_LOG_ROUNDS = 12
+
+    # Run bcrypt on a thread pool instead of the request thread.
+    ASYNC_BCRYPT = (
+        os.getenv('ASYNC_BCRYPT', '').lower() in ('1', 'true', 'yes'))
+
+class TestConfig(object):
+    """Settings used by the test suite."""
+
+    TESTING = True
+    DEBUG = False
+    WTF_CSRF_ENABLED = False
+
+    # A single in-memory connection shared by every session, so tests never
+    # touch the on-disk database.
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'poolclass': StaticPool,
+        'connect_args': {'check_same_thread': False},
+    }
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ECHO = False
+    # Flask-SQLAlchemy records every query (and where it was issued from)
+    # when TESTING is on, unless this is turned off explicitly.
+    SQLALCHEMY_RECORD_QUERIES = False
+
+    # Minimum bcrypt cost so hashes made inside routes (e.g. /signup) are cheap.
+    BCRYPT_LOG_ROUNDS = 4
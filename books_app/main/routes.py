@@ -6,8 +6,8 @@ from books_app.models import Book, Author, Genre, User
 from books_app.main.forms import BookForm, AuthorForm, GenreForm
 from books_app import bcrypt
 
-# Import app and db from events_app package so that we can run app
-from books_app import app, db
+# Import db from books_app package so that we can run app
+from books_app import db
 
 main = Blueprint("main", __name__)
 
@@ -0,0 +1,64 @@
+"""Base test case that gives each test class its own app and database."""
+import unittest
+
+from sqlalchemy import event
+
+from books_app import create_app, db
+from books_app.config import TestConfig
+
+
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    """Tune a test database connection for speed over durability."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA synchronous=OFF')
+    cursor.execute('PRAGMA journal_mode=MEMORY')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-64000')
+    cursor.close()
+
+
+class BaseTestCase(unittest.TestCase):
+    """Creates the app once per class and isolates each test."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Executed once before the tests in this class."""
+        cls.app = create_app(TestConfig)
+        cls.app_context = cls.app.app_context()
+        cls.app_context.push()
+        # Only this app's engine is tuned, before its first connection.
+        event.listen(db.engine, 'connect', set_sqlite_pragma)
+        db.create_all()
+        cls.client = cls.app.test_client()
+
+    @classmethod
+    def tearDownClass(cls):
+        """Executed once after the tests in this class."""
+        db.drop_all()
+        cls.app_context.pop()
+
+    def setUp(self):
+        """Executed prior to each test."""
+        # Run the test inside a transaction that tearDown rolls back, so the
+        # schema only has to be created once per class.
+        self.connection = db.engine.connect()
+        self.transaction = self.connection.begin()
+        self.session = db.session
+        db.session = db.create_scoped_session(
+            options={'bind': self.connection, 'binds': {}})
+
+    def tearDown(self):
+        """Executed after each test."""
+        db.session.remove()
+        db.session = self.session
+        self.transaction.rollback()
+        self.connection.close()
+
+    def assertAllIn(self, needles, text, absent=()):
+        """Check that text contains every needle and nothing in absent."""
+        for needle in needles:
+            with self.subTest(needle=needle):
+                self.assertIn(needle, text)
+        for needle in absent:
+            with self.subTest(absent=needle):
+                self.assertNotIn(needle, text)
@@ -0,0 +1,33 @@
+"""Create the books and user shared by the test suites."""
+from datetime import date
+
+from bcrypt import gensalt, hashpw
+
+from books_app import db
+from books_app.models import Book, Author, User
+
+# Hash the fixture password once instead of once per test.
+_PW_HASH = hashpw(b'password', gensalt(rounds=4)).decode('utf-8')
+
+_MOCKINGBIRD_DATE = date(1960, 7, 11)
+
+
+def create_books():
+    a1 = Author(name='Harper Lee')
+    b1 = Book(
+        title='To Kill a Mockingbird',
+        publish_date=_MOCKINGBIRD_DATE,
+        author=a1
+    )
+
+    a2 = Author(name='Sylvia Plath')
+    b2 = Book(title='The Bell Jar', author=a2)
+
+    db.session.add_all([a1, b1, a2, b2])
+    db.session.commit()
+
+
+def create_user():
+    user = User(username='me1', password=_PW_HASH)
+    db.session.add(user)
+    db.session.commit()